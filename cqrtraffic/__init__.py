@@ -1,6 +1,11 @@
 # Import dependencies
+import logging
+
 from . import utils
 from . import fintraffic
 
+# Leave the logging configuration to the application
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 # Define __all__
 __all__ = ["utils", "fintraffic"]
@@ -2,7 +2,6 @@
 from pystoned import wCQER
 import time
 import matplotlib.pyplot as plt
-from matplotlib.pyplot import figure
 import enum
 import numpy as np
 
@@ -65,9 +64,9 @@ class FintrafficTMS:
         self.bag_data = process.bagging(self.agg_data, gridsize_x, gridsize_y)
         self.gridsize_x = gridsize_x
         self.gridsize_y = gridsize_y
-        self.bag_density = self.bag_data["centroid_density"]
-        self.bag_flow = self.bag_data["centroid_flow"]
-        self.weight = self.bag_data["weight"]
+        self.bag_density = self.bag_data["centroid_density"].to_numpy(dtype=np.float64)
+        self.bag_flow = self.bag_data["centroid_flow"].to_numpy(dtype=np.float64)
+        self.weight = self.bag_data["weight"].to_numpy(dtype=np.float64)
 
     def weighted_model(self, tau_list: list = None, email: str = None):
         self.bagged_model = []
@@ -77,10 +76,7 @@ class FintrafficTMS:
         for tau in tau_list:
             start_time = time.perf_counter()
             model = wCQER.wCQR(
-                y=self.bag_data.centroid_flow,
-                x=self.bag_data.centroid_density,
-                w=self.weight,
-                tau=tau,
+                y=self.bag_flow, x=self.bag_density, w=self.weight, tau=tau
             )
             model.__model__.beta.setlb(None)
             if email is not None:
@@ -91,98 +87,57 @@ class FintrafficTMS:
             end_time = time.perf_counter()
             self.time_weighted.append(end_time - start_time)
 
+    def _draw_points(self, ax, representation: Representations):
+        if representation == Representations.agg:
+            x, y = self.agg_density, self.agg_flow
+            marker, size, label = "x", None, "Aggregated data"
+        elif representation == Representations.bag:
+            x, y = self.bag_density, self.bag_flow
+            marker, size, label = "x", None, "Bagged data"
+        elif representation == Representations.bag_w:
+            x, y = self.bag_density, self.bag_flow
+            marker, size = "o", self.weight * 10000
+            label = "Bagged data with weighted representation"
+        ax.scatter(x, y, marker=marker, c="black", s=size, label=label)
+
     def plot_data(self, representation: Representations):
         if isinstance(representation, Representations):
-            plt.clf()
-            figure(figsize=(10, 10), dpi=400)
-
-            if representation == Representations.agg:
-                plt.scatter(
-                    self.agg_density,
-                    self.agg_flow,
-                    marker="x",
-                    c="black",
-                    label="Aggregated data",
-                )
-            elif representation == Representations.bag:
-                plt.scatter(
-                    self.bag_density,
-                    self.bag_flow,
-                    marker="x",
-                    c="black",
-                    label="Bagged data",
-                )
-            elif representation == Representations.bag_w:
-                plt.scatter(
-                    self.bag_density,
-                    self.bag_flow,
-                    marker="o",
-                    c="black",
-                    s=self.weight * 10000,
-                    label="Bagged data with weighted representation",
-                )
+            fig, ax = plt.subplots(figsize=(10, 10), dpi=400)
+            self._draw_points(ax, representation)
 
-            plt.xlabel("Density [veh/km]")
-            plt.ylabel("Flow [veh/h]")
-            plt.legend()
+            ax.set_xlabel("Density [veh/km]")
+            ax.set_ylabel("Flow [veh/h]")
+            ax.legend()
+            return fig
         else:
             raise Exception(f"Representation {representation} does not exist")
 
     def plot_model(self, data_representation: Representations):
         if isinstance(data_representation, Representations):
-            plt.clf()
-            figure(figsize=(10, 10), dpi=400)
-
-            if data_representation == Representations.agg:
-                plt.scatter(
-                    self.agg_density,
-                    self.agg_flow,
-                    marker="x",
-                    c="black",
-                    label="Aggregated data",
-                )
-            elif data_representation == Representations.bag:
-                plt.scatter(
-                    self.bag_density,
-                    self.bag_flow,
-                    marker="x",
-                    c="black",
-                    label="Bagged data",
-                )
-            elif data_representation == Representations.bag_w:
-                plt.scatter(
-                    self.bag_density,
-                    self.bag_flow,
-                    marker="o",
-                    c="black",
-                    s=self.weight * 10000,
-                    label="Bagged data with weighted representation",
-                )
+            fig, ax = plt.subplots(figsize=(10, 10), dpi=400)
+            self._draw_points(ax, data_representation)
 
             cmap = plt.get_cmap("plasma")
             slicedCM = cmap(np.linspace(0, 1, len(self.bagged_model)))
             color_index = 0
             for model in self.bagged_model:
-                x = np.array(model.x).flatten()
-                y = np.array(model.y).T
-                yhat = np.array(model.get_frontier()).T
-
-                data = (np.stack([x, y, yhat])).T
+                x = np.asarray(model.x, dtype=np.float64).ravel()
+                yhat = np.asarray(model.get_frontier(), dtype=np.float64).ravel()
 
                 # sort
-                data = data[np.argsort(data[:, 0])].T
-                x, y, f = data[0], data[1], data[2]
-                plt.plot(
-                    x,
-                    f,
+                order = np.argsort(x, kind="stable")
+                ax.plot(
+                    x[order],
+                    yhat[order],
                     c=slicedCM[color_index],
                     label="tau=" + str(self.tau_list[color_index]),
                 )
                 color_index += 1
 
-            plt.xlabel("Density [veh/km]")
-            plt.ylabel("Flow [veh/h]")
-            plt.legend()
+            ax.set_xlabel("Density [veh/km]")
+            ax.set_ylabel("Flow [veh/h]")
+            ax.legend()
+            return fig
         else:
             raise Exception(f"Representation {data_representation} does not exist")
 
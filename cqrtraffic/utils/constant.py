@@ -1,10 +1,11 @@
 # URL to the source of traffic data in Finland
 URL_FINTRAFFIC = (
-    "https://tie-test.digitraffic.fi/api/tms/history/raw/lamraw_TMS_YY_DD.csv"
+    "https://tie-test.digitraffic.fi/api/tms/history/raw/lamraw_{tms}_{yy:02d}_{day}.csv"  # noqa E501
 )
 """
 URL to access raw data from traffic measurement stations, \
-installed on the roads in Finland.
+installed on the roads in Finland. The `tms`, `yy` (two-digit year) \
+and `day` fields are filled in with :meth:`str.format`.
 
 Source: `Finntraffic <https://www.fintraffic.fi/en>`_ \
 / `Digitraffic <https://www.digitraffic.fi/en/>`_ under \
@@ -38,6 +39,21 @@ DEF_COL_NAMES_FINTRAFFIC = [
 Standardized column names for files containing traffic data from Finland.
 """
 
+DEF_COL_NAMES_AGGREGATE = [
+    "id",
+    "date",
+    "hour",
+    "minute",
+    "direction",
+    "speed",
+    "cars",
+    "buses",
+    "trucks",
+]
+"""
+Columns of the raw data used for aggregation.
+"""
+
 DEF_AGG_TIME_PER = 5
 """
 Default aggregation time period.
@@ -47,3 +63,8 @@ DEF_TAU_LIST = [0.5]
 """
 Default list of quantiles to be estimated.
 """
+
+DEF_CACHE_DIR = "~/.cache/cqrtraffic"
+"""
+Default directory for locally cached raw data from Fintraffic.
+"""
@@ -1,13 +1,96 @@
 # import dependencies
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 import time
+import io
 import requests
-import datetime
 import warnings
 import pathlib
 import os
+import tempfile
+import logging
+import threading
+import collections
+import concurrent.futures
+from requests.adapters import HTTPAdapter
 
-from .constant import DEF_COL_NAMES_FINTRAFFIC, URL_FINTRAFFIC
+from .constant import DEF_CACHE_DIR, DEF_COL_NAMES_FINTRAFFIC, URL_FINTRAFFIC
+
+logger = logging.getLogger(__name__)
+
+# In-memory cache of loaded reports, shared by all calls within a session and
+# limited by the total memory used by the cached pd.DataFrames
+_MEMORY_CACHE = collections.OrderedDict()
+_MEMORY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_MEMORY_CACHE_LOCK = threading.Lock()
+_memory_cache_bytes = 0
+
+
+def _cache_path(
+    tms_id: int,
+    year: int,
+    day: int,
+    direction: int,
+    hour_from: int,
+    hour_to: int,
+    delete_if_faulty: bool,
+) -> pathlib.Path:
+    # The cache directory can be overridden with the CQRTRAFFIC_CACHE variable
+    cache_dir = pathlib.Path(os.environ.get("CQRTRAFFIC_CACHE", DEF_CACHE_DIR))
+    name = f"{tms_id}_{year}_{day}_{direction}_{hour_from}_{hour_to}_{int(delete_if_faulty)}.parquet"  # noqa E501
+    return cache_dir.expanduser() / name
+
+
+def _save_to_cache(df: pd.DataFrame, cache_path: pathlib.Path):
+    # Write to a temporary file first and move it in place, so that concurrent
+    # readers never see a partially written file
+    tmp_path = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=cache_path.parent, suffix=".tmp", delete=False
+        ) as tmp_file:
+            tmp_path = tmp_file.name
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+    except (OSError, pa.ArrowException) as error:
+        warnings.warn(f"Warning: Unable to cache the data in {cache_path}: {error}")
+    finally:
+        # Do not leave a partially written file behind
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _load_from_memory(key: tuple) -> pd.DataFrame:
+    # Return a copy, so that callers can modify the result freely
+    with _MEMORY_CACHE_LOCK:
+        entry = _MEMORY_CACHE.get(key)
+        if entry is None:
+            return None
+        _MEMORY_CACHE.move_to_end(key)
+    return entry[0].copy()
+
+
+def _save_to_memory(key: tuple, df: pd.DataFrame):
+    # Keep only the most recently used reports that fit into the memory limit
+    global _memory_cache_bytes
+    size = int(df.memory_usage(deep=True).sum())
+    if size > _MEMORY_CACHE_MAX_BYTES:
+        return
+    with _MEMORY_CACHE_LOCK:
+        if key in _MEMORY_CACHE:
+            _memory_cache_bytes -= _MEMORY_CACHE.pop(key)[1]
+        _MEMORY_CACHE[key] = (df.copy(), size)
+        _memory_cache_bytes += size
+        while _memory_cache_bytes > _MEMORY_CACHE_MAX_BYTES:
+            _memory_cache_bytes -= _MEMORY_CACHE.popitem(last=False)[1][1]
 
 
 # Download the .csv report of `tms_id` station for the day `day_of_year`
@@ -20,6 +103,8 @@ def read_report(
     hour_to: int = 20,
     delete_if_faulty: bool = True,
     save_name: str = None,
+    session: requests.Session = None,
+    use_cache: bool = True,
 ) -> pd.DataFrame:
     """
     Download the raw data from Fintraffic for the `tms_id` station for the `day` of the `year`. \
@@ -27,6 +112,11 @@ def read_report(
     Also, the type of vehicle is determined based on the classification from Fintraffic.
 
     | It is possible to save a `.gzip` file, specifying a `save_name`. 
+    | Loaded data is cached locally, so the same day is downloaded only once. \
+    Recently loaded days are also kept in memory for the rest of the session, \
+    using up to 256 MB in total. \
+    The cache is stored in `~/.cache/cqrtraffic`, unless the `CQRTRAFFIC_CACHE` \
+    environment variable points to another directory.
     
     Parameters
     ----------
@@ -50,6 +140,11 @@ def read_report(
         If `True`, observations with the `1` value for the column `if_faulty` will be deleted, by default True
     save_name : str, optional
         If specified, saves loaded data in the .gzip format, by default None
+    session : requests.Session, optional
+        A session used to reach the server, allowing connections to be reused \
+        between calls. If not specified, a one-off request is made, by default None
+    use_cache : bool, optional
+        If `True`, data is read from and saved to the local caches, by default True
 
     Returns
     -------
@@ -65,7 +160,7 @@ def read_report(
     start_time = time.perf_counter()
 
     # Initiation message
-    print(f"Trying to load data for the day {day} of year {year} from the server...")
+    logger.info("Trying to load data for the day %d of year %d...", day, year)
 
     # Check assert errors
     # fmt: off
@@ -83,47 +178,93 @@ def read_report(
     # Initiate an empty the pd.DataFrame
     df = pd.DataFrame()
 
-    # Assign URL path for data loading
-    url = URL_FINTRAFFIC
-
     # Create the actual url
-    url = (
-        url.replace("TMS", str(tms_id))
-        .replace("YY", str(year)[2:4])
-        .replace("DD", str(day))
-    )
-
-    # Try to download the file
-    if requests.get(url).status_code != 404:
-
-        # Download the file from the server
-        df = pd.read_csv(url, delimiter=";", names=column_names)
-
-        # Assign dates
-        df["date"] = datetime.date(year, 1, 1) + datetime.timedelta(day - 1)
-
-        # Calculate the number of different vehicles
-        df["cars"] = df["vehicle"].apply(lambda x: 1 if x == 1 else 0)
-        df["buses"] = df["vehicle"].apply(lambda x: 1 if x == 3 else 0)
-        df["trucks"] = df["vehicle"].apply(
-            lambda x: 1 if x == 2 or x == 4 or x == 5 or x == 6 or x == 7 else 0
-        )
-
-        # Delete faulty data point
-        if delete_if_faulty is True:
-            df = df[df.faulty != 1]
-
-        # Select data only from the specified timeframe
-        df = df[df.total_time >= hour_from * 60 * 60 * 100]
-        df = df[df.total_time <= hour_to * 60 * 60 * 100]
-
-        # Filter the correct direction
-        df = df[df.direction == direction]
+    url = URL_FINTRAFFIC.format(tms=tms_id, yy=year % 100, day=day)
+
+    # Check the local caches first, as historical data does not change
+    cache_key = (tms_id, year, day, direction, hour_from, hour_to, delete_if_faulty)
+    cached_df = None
+    cache_path = None
+    if use_cache is True:
+        cached_df = _load_from_memory(cache_key)
+        cache_path = _cache_path(*cache_key)
+
+    if cached_df is not None:
+        df = cached_df
+        found = True
+        source = "the memory cache"
+    elif cache_path is not None and cache_path.exists():
+        df = pd.read_parquet(cache_path, engine="pyarrow")
+        _save_to_memory(cache_key, df)
+        found = True
+        source = f"the disk cache {cache_path}"
+    else:
+        source = "the server"
+
+        # Try to download the file, the single request also tells if the day exists
+        http = session if session is not None else requests
+        response = http.get(url, timeout=30)
+        found = response.status_code != 404
+
+        if found:
+            # Do not parse error pages as data
+            response.raise_for_status()
+
+            # Read the downloaded file
+            table = pacsv.read_csv(
+                io.BytesIO(response.content),
+                read_options=pacsv.ReadOptions(column_names=column_names),
+                parse_options=pacsv.ParseOptions(delimiter=";"),
+            )
 
+            # Select data only from the specified timeframe and direction,
+            # deleting faulty data points if necessary
+            time_from = hour_from * 60 * 60 * 100
+            time_to = hour_to * 60 * 60 * 100
+            total_time = table["total_time"].to_numpy()
+            if np.all(total_time[:-1] <= total_time[1:]):
+                # Reports are usually ordered by time, so the timeframe
+                # is a contiguous slice found by binary search
+                start = np.searchsorted(total_time, time_from, side="left")
+                stop = np.searchsorted(total_time, time_to, side="right")
+                table = table.slice(start, stop - start)
+                mask = pc.equal(table["direction"], direction)
+            else:
+                mask = pc.and_(
+                    pc.and_(
+                        pc.greater_equal(table["total_time"], time_from),
+                        pc.less_equal(table["total_time"], time_to),
+                    ),
+                    pc.equal(table["direction"], direction),
+                )
+            if delete_if_faulty is True:
+                not_faulty = pc.fill_null(pc.not_equal(table["faulty"], 1), True)
+                mask = pc.and_(mask, not_faulty)
+            df = table.filter(mask).to_pandas()
+
+            # Assign dates as a typed datetime64 column
+            df["date"] = pd.Timestamp(year, 1, 1) + pd.Timedelta(days=day - 1)
+
+            # Calculate the number of different vehicles
+            df["cars"] = (df["vehicle"] == 1).astype(int)
+            df["buses"] = (df["vehicle"] == 3).astype(int)
+            df["trucks"] = df["vehicle"].isin([2, 4, 5, 6, 7]).astype(int)
+
+            # Save to the caches
+            if cache_path is not None:
+                _save_to_memory(cache_key, df)
+                _save_to_cache(df, cache_path)
+
+    if found:
         # Stop timer
         end_time = time.perf_counter()
-        print(
-            f"Download successful - file for the sensor {tms_id} for the day {day} in year {year} was loaded in {end_time-start_time:0.4f} seconds"  # noqa E501
+        logger.info(
+            "Loading successful - file for the sensor %s for the day %d in year %d was loaded from %s in %0.4f seconds",  # noqa E501
+            tms_id,
+            day,
+            year,
+            source,
+            end_time - start_time,
         )
 
         # Save to .gzip if necessary
@@ -132,11 +273,11 @@ def read_report(
                 ".gzip"
             ), "Error: Filename is wrong, please, provide it in *.gzip format"
             df.to_parquet(save_name, engine="pyarrow", compression="gzip")
-            print(f"Data is successfully saved to {save_name}")
+            logger.info("Data is successfully saved to %s", save_name)
     else:
         # Stop timer
         end_time = time.perf_counter()
-        print(f"Time spent: {end_time-start_time:0.4f} seconds")
+        logger.info("Time spent: %0.4f seconds", end_time - start_time)
         message = (
             "Warning: The data for the TMS "
             + str(tms_id)
@@ -165,10 +306,13 @@ def read_several_reports(
     hour_to: int = 20,
     delete_if_faulty: bool = True,
     save_name: str = None,
+    max_workers: int = 16,
+    use_cache: bool = True,
 ) -> pd.DataFrame:
     """
     Download the raw data from Fintraffic for the `tms_id` station for the `days_list` of the `year`. \
     Data for each day is loaded separately using :func:`~cqrttraffic.utils.load.read_report` and then appended together.
+    Days are downloaded concurrently, up to `max_workers` at a time.
     By default the data is cleaned - faulty observations are deleted. \
     Also, the type of vehicle is determined based on the classification from Fintraffic.
 
@@ -191,6 +335,10 @@ def read_several_reports(
         If `True`, observations with the `1` value for the column `if_faulty` will be deleted, by default True
     save_name : str, optional
         If specified, saves loaded data in the .gzip format, by default None
+    max_workers : int, optional
+        The maximum number of days downloaded at the same time, by default 16
+    use_cache : bool, optional
+        If `True`, data is read from and saved to the local caches, by default True
 
     Returns
     -------
@@ -207,8 +355,8 @@ def read_several_reports(
     # Initiate counter
     counter = 0
 
-    # Initiate an empty the pd.DataFrame
-    df = pd.DataFrame()
+    # Initiate a list of loaded pd.DataFrames
+    frames = []
 
     # Check assert errors
     # fmt: off
@@ -216,29 +364,16 @@ def read_several_reports(
     assert 0 < hour_to <= 24, "Error: the hour_to is incorrect, it should be 0 < hour_to <= 24"  # noqa
     assert hour_from < hour_to, "Error: the hour_to should be less than hour_to"  # noqa 
     assert direction == 1 or direction == 2, "Error: direction must be either 1 or 2, check TMS station description" # noqa
+    assert max_workers >= 1, "Error: max_workers should be at least 1" # noqa
     # fmt: on
 
-    # Interate through each day
-    for count, value in enumerate(year_day_list):
-        # Initiate loaded pd.DataFrame
-        read_df = pd.DataFrame()
-
-        if df.empty:
-            read_df = read_report(
-                tms_id,
-                value[0],
-                value[1],
-                direction,
-                hour_from,
-                hour_to,
-                delete_if_faulty,
-                save_name=None,
-            )
-            if read_df.empty is False:
-                df = read_df
-                counter += 1
-        else:
-            read_df = read_report(
+    # Download the days concurrently, sharing a pool of connections to the server
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    with session, concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        results = executor.map(
+            lambda value: read_report(
                 tms_id,
                 value[0],
                 value[1],
@@ -247,10 +382,21 @@ def read_several_reports(
                 hour_to,
                 delete_if_faulty,
                 save_name=None,
-            )
+                session=session,
+                use_cache=use_cache,
+            ),
+            year_day_list,
+        )
+
+        # Interate through each day
+        for read_df in results:
             if read_df.empty is False:
-                df = pd.concat((df, read_df), ignore_index=True)
+                frames.append(read_df)
                 counter += 1
+
+    # Append the days together at once
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
     # Check that some data was loaded
     assert df.empty is False, "Error: Data was not loaded, check the input given."
 
@@ -258,8 +404,11 @@ def read_several_reports(
     end_time = time.perf_counter()
 
     # Confirm the result
-    print(
-        f"Loading sucessful: {counter} out of {len(year_day_list)} files loaded in {end_time-start_time:0.4f} seconds"  # noqa E521
+    logger.info(
+        "Loading sucessful: %d out of %d files loaded in %0.4f seconds",
+        counter,
+        len(year_day_list),
+        end_time - start_time,
     )
 
     # Save to .gzip if necessary
@@ -268,12 +417,12 @@ def read_several_reports(
             ".gzip"
         ), "Error: Filename is wrong, please, provide it in *.gzip format"
         df.to_parquet(save_name, engine="pyarrow", compression="gzip")
-        print(f"Data is successfully saved to {save_name}")
+        logger.info("Data is successfully saved to %s", save_name)
 
     return df
 
 
-def read_gzip_ft(filepath: str) -> pd.DataFrame:
+def read_gzip_ft(filepath: str, columns: list = None) -> pd.DataFrame:
     """
     Reads a .gzip file, containing raw data from Fintraffic, which was previously loaded and saved using the functionality of this package.
 
@@ -281,6 +430,10 @@ def read_gzip_ft(filepath: str) -> pd.DataFrame:
     ----------
     filepath : str
         A string, which contains a path to the .gzip file.
+    columns : list, optional
+        If specified, only these columns are loaded. \
+        :func:`~cqrtraffic.utils.process.aggregate` needs only the columns listed in \
+        :data:`~cqrtraffic.utils.constant.DEF_COL_NAMES_AGGREGATE`, by default None
 
     Returns
     -------
@@ -296,7 +449,7 @@ def read_gzip_ft(filepath: str) -> pd.DataFrame:
     start_time = time.perf_counter()
 
     # Initiation message
-    print(f"Trying to load data locally from {filepath} ...")
+    logger.info("Trying to load data locally from %s ...", filepath)
 
     # Initialize pd.DataFrame
     df = pd.DataFrame()
@@ -311,7 +464,9 @@ def read_gzip_ft(filepath: str) -> pd.DataFrame:
 
     # Load a file locally
     if (os.path.exists(filepath) is True) and (os.path.getsize(filepath) != 0):
-        df = pd.read_parquet(filepath)
+        df = pd.read_parquet(
+            filepath, engine="pyarrow", columns=columns, use_threads=True
+        )
     else:
         raise Exception(
             "File is empty or it does not exist at the given filepath. Please, check the file or the filepath."  # noqa E521
@@ -321,8 +476,9 @@ def read_gzip_ft(filepath: str) -> pd.DataFrame:
     end_time = time.perf_counter()
 
     # Confirm the result
-    print(
-        f"Loading completed: the file was loaded in {end_time-start_time:0.4f} seconds"  # noqa E521
+    logger.info(
+        "Loading completed: the file was loaded in %0.4f seconds",
+        end_time - start_time,
     )
 
     return df